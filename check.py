@@ -23,18 +23,11 @@
 import os
 import subprocess
 
-def queryFileOwner(filename):
-
-  p = subprocess.Popen(["pacman", "--noconfirm", "-Qo", filename], stderr=subprocess.PIPE, stdout=subprocess.PIPE)
-  data = p.communicate()
+import file_owner_index
 
-  stdout = data[0].decode()
-  stderr = data[1].rstrip(b'\n').decode()
-
-  if p.returncode != 0:
-      raise Exception("Failed to get owner. {0}".format(stderr))
+def queryFileOwner(filename):
 
-  return stdout.split()[-2]
+  return file_owner_index.get_file_owner( filename )
 
 def dependencies( filename ):
 
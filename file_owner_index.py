@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""File owner index.
+
+Answer "which package owns this file" queries without calling `pacman -Qo`
+for every file, which loads the whole local database on each call.
+
+The `files` entries of the local database are flattened once into a sorted
+index file which is memory-mapped and binary-searched. The index is kept in
+the user cache directory, tagged with the local database modification time,
+and only rebuilt when the database changes. Since it is replaced atomically,
+several processes can map and read it at the same time.
+
+Index layout:
+    * header: magic, database mtime (ns) and number of records.
+    * offsets: one unsigned 64 bit offset per record, in sorted order.
+    * records: b"<absolute path>\\0<package name>\\n".
+"""
+
+import os
+import mmap
+import struct
+import tempfile
+
+import package_manager_api
+
+INDEX_PATH = os.path.join(
+  os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+  "outdated-aur-package-installer",
+  "file-owners.idx")
+"""str: Where the file owner index is stored."""
+
+_MAGIC = b"OAPIFO01"
+_HEADER = struct.Struct("<8sqQ")
+_OFFSET = struct.Struct("<Q")
+
+# (mmap, database mtime, number of records) of the loaded index
+_index = None
+
+def _db_mtime():
+  return os.stat( package_manager_api.LOCAL_DB_PATH ).st_mtime_ns
+
+def _read_package_files(files_path):
+  """
+  Read the list of (non directory) files from a local database `files` entry.
+  """
+
+  paths = []
+
+  with open(files_path, "rb") as f:
+
+    in_files_section = False
+
+    for line in f:
+
+      line = line.rstrip(b"\n")
+
+      if line.startswith(b"%"):
+        in_files_section = (line == b"%FILES%")
+        continue
+
+      # directories are listed with a trailing slash
+      if not in_files_section or not line or line.endswith(b"/"):
+        continue
+
+      paths.append( b"/" + line )
+
+  return paths
+
+def _build(db_mtime):
+
+  records = []
+
+  for package, entry_path in package_manager_api.get_local_db_entries().items():
+
+    files_path = os.path.join(entry_path, "files")
+    if not os.path.isfile( files_path ):
+      continue
+
+    pkg = package.encode()
+    for path in _read_package_files( files_path ):
+      records.append( (path, pkg) )
+
+  records.sort()
+
+  offsets = []
+  data = []
+  offset = _HEADER.size + _OFFSET.size * len(records)
+  for path, pkg in records:
+    record = path + b"\0" + pkg + b"\n"
+    offsets.append( offset )
+    data.append( record )
+    offset += len(record)
+
+  index_dir = os.path.dirname( INDEX_PATH )
+  os.makedirs(index_dir, exist_ok=True)
+
+  # write to a temporary file and rename it, so that readers never see a
+  # partially written index.
+  fd, tmp_path = tempfile.mkstemp(dir=index_dir)
+  try:
+    with os.fdopen(fd, "wb") as f:
+      f.write( _HEADER.pack(_MAGIC, db_mtime, len(records)) )
+      f.write( b"".join( map(_OFFSET.pack, offsets) ) )
+      f.write( b"".join( data ) )
+    os.replace(tmp_path, INDEX_PATH)
+  except BaseException:
+    os.unlink( tmp_path )
+    raise
+
+def _open():
+  """
+  Map the index file. Returns None if it is missing, invalid or outdated.
+  """
+
+  try:
+    with open(INDEX_PATH, "rb") as f:
+      mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+  except (OSError, ValueError):
+    # ValueError is raised when mapping an empty file
+    return None
+
+  if len(mm) < _HEADER.size:
+    mm.close()
+    return None
+
+  magic, db_mtime, count = _HEADER.unpack_from(mm, 0)
+
+  if magic != _MAGIC or db_mtime != _db_mtime():
+    mm.close()
+    return None
+
+  return (mm, db_mtime, count)
+
+def _load():
+
+  global _index
+
+  if _index is not None and _index[1] == _db_mtime():
+    return _index
+
+  if _index is not None:
+    _index[0].close()
+
+  _index = _open()
+
+  if _index is None:
+    _build( _db_mtime() )
+    _index = _open()
+
+  if _index is None:
+    raise Exception("Failed to load file owner index: {0}".format( INDEX_PATH ))
+
+  return _index
+
+def _lookup(index, path):
+
+  mm, _, count = index
+
+  lo = 0
+  hi = count
+
+  while lo < hi:
+
+    mid = (lo + hi) // 2
+
+    start = _OFFSET.unpack_from(mm, _HEADER.size + _OFFSET.size * mid)[0]
+    sep = mm.find(b"\0", start)
+    key = mm[start:sep]
+
+    if key < path:
+      lo = mid + 1
+    elif path < key:
+      hi = mid
+    else:
+      end = mm.find(b"\n", sep)
+      return mm[sep + 1:end].decode()
+
+  return None
+
+# public API
+
+def get_file_owner(filename):
+  """
+  Get the name of the package owning the given file.
+  """
+
+  index = _load()
+
+  path = os.path.abspath( filename )
+
+  owner = _lookup(index, os.fsencode( path ))
+
+  # pacman records paths as installed, so try again resolving symlinks.
+  if owner is None:
+    owner = _lookup(index, os.fsencode( os.path.realpath( path ) ))
+
+  if owner is None:
+    raise Exception("Failed to get owner. No package owns {0}".format( filename ))
+
+  return owner
@@ -17,6 +17,11 @@ PACKAGE_MANAGER = "yay"
 It should be able to manage the Arch User Repository (AUR) and be compliant with the pacman interface.
 """
 
+LOCAL_DB_PATH = "/var/lib/pacman/local"
+"""str: The pacman local database directory.
+It holds one "<name>-<version>-<release>" entry per installed package.
+"""
+
 def _pacman(flags, pkgs=[], eflgs=[], silent=True):
   """
   Subprocess wrapper for the package manager.
@@ -64,6 +69,24 @@ def _sanitize_list_string(text, sep='\n'):
 
 # public API
 
+def get_local_db_entries():
+  """
+  Get a dictionary mapping installed package names to their local database entry directory.
+  """
+
+  entries = {}
+
+  for entry in os.listdir( LOCAL_DB_PATH ):
+
+    entry_path = os.path.join(LOCAL_DB_PATH, entry)
+    if not os.path.isdir( entry_path ):
+      continue
+
+    # pkgver and pkgrel can't contain dashes, but pkgname can.
+    entries[ entry.rsplit('-', 2)[0] ] = entry_path
+
+  return entries
+
 def is_found(package):
   """
   Returns True if the package is found in the package managers remote db.
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""Package mtree metadata.
+
+Pacman keeps the type, mode, size, modification time and digests of every
+file a package installs in the gzip compressed `mtree` entry of the local
+database. This module stream-parses it, so that files can be classified
+without stat-ing or opening them.
+"""
+
+import os
+import re
+import gzip
+import collections
+
+import package_manager_api
+
+MtreeEntry = collections.namedtuple("MtreeEntry", ["path", "type", "mode", "size", "time", "sha256"])
+"""namedtuple: A file described by a package mtree.
+path is absolute, mode and size are ints (or None), time is the
+modification time in whole seconds (or None).
+"""
+
+_ESCAPE_RE = re.compile(rb"\\([0-7]{3})")
+
+_SHARED_OBJECT_RE = re.compile(r"\.so(\.[0-9]+)*$")
+
+def _unescape(path):
+  # mtree paths are vis(3) encoded, eg. spaces are written as \040
+  return _ESCAPE_RE.sub(lambda m: bytes([int(m.group(1), 8)]), path)
+
+def _parse_keywords(words):
+
+  keywords = {}
+
+  for word in words:
+    key, _, value = word.partition(b"=")
+    keywords[ key.decode() ] = value.decode()
+
+  return keywords
+
+def _to_entry(path, keywords):
+
+  mode = keywords.get("mode")
+  size = keywords.get("size")
+  time = keywords.get("time")
+
+  return MtreeEntry(
+    path=os.fsdecode( _unescape(path) )[1:],
+    type=keywords.get("type"),
+    mode=int(mode, 8) if mode is not None else None,
+    size=int(size) if size is not None else None,
+    # time reads <seconds>.<nanoseconds>
+    time=int(time.split(".")[0]) if time is not None else None,
+    sha256=keywords.get("sha256digest"))
+
+# public API
+
+def read_mtree(mtree_filename):
+  """
+  Iterate over the entries of a gzip compressed mtree file.
+  Package metadata files (.PKGINFO, .BUILDINFO, ...) are skipped.
+  """
+
+  defaults = {}
+
+  with gzip.open(mtree_filename, "rb") as f:
+
+    for line in f:
+
+      words = line.split()
+
+      if not words or words[0].startswith(b"#"):
+        continue
+
+      if words[0] == b"/set":
+        defaults.update( _parse_keywords( words[1:] ) )
+        continue
+
+      if words[0] == b"/unset":
+        for key in words[1:]:
+          defaults.pop(key.decode(), None)
+        continue
+
+      path = words[0]
+
+      # top level dot files are package metadata, not installed files
+      if path.startswith(b"./.") and path.count(b"/") == 1:
+        continue
+
+      keywords = dict(defaults)
+      keywords.update( _parse_keywords( words[1:] ) )
+
+      yield _to_entry(path, keywords)
+
+def is_object_candidate(entry):
+  """
+  Returns True if the entry may be a dynamically linked executable or
+  shared object, judging only by its mtree metadata.
+  """
+
+  if entry.type != "file":
+    return False
+
+  if entry.mode is not None and entry.mode & 0o111:
+    return True
+
+  return _SHARED_OBJECT_RE.search( entry.path ) is not None
+
+def is_modified(entry):
+  """
+  Returns True if the installed file size or modification time differs from
+  the mtree entry, or if the file is missing. Use it to decide whether
+  results cached for an untouched file can be reused.
+  """
+
+  try:
+    st = os.lstat( entry.path )
+  except FileNotFoundError:
+    return True
+
+  if entry.size is not None and st.st_size != entry.size:
+    return True
+
+  if entry.time is not None and int(st.st_mtime) != entry.time:
+    return True
+
+  return False
+
+def get_package_mtree(package):
+  """
+  Get the list of mtree entries of an installed package.
+  """
+
+  entries = package_manager_api.get_local_db_entries()
+
+  if package not in entries:
+    raise Exception("Failed to read mtree: package {0} not found in {1}".format( package, package_manager_api.LOCAL_DB_PATH ))
+
+  return list(read_mtree( os.path.join(entries[package], "mtree") ))
@@ -21,9 +21,12 @@
 #
 
 import os
+import re
 import subprocess
 import networkx as nx
 
+import file_owner_index
+
 def queryPackageInfo(package_name):
 
   p = subprocess.Popen(["pacman", "--noconfirm", "-Qi", package_name], stderr=subprocess.PIPE, stdout=subprocess.PIPE)
@@ -44,16 +47,7 @@ def queryPackageInfo(package_name):
 
 def queryFileOwner(filename):
 
-  p = subprocess.Popen(["pacman", "--noconfirm", "-Qo", filename], stderr=subprocess.PIPE, stdout=subprocess.PIPE)
-  data = p.communicate()
-
-  stdout = data[0].decode()
-  stderr = data[1].rstrip(b'\n').decode()
-
-  if p.returncode != 0:
-      raise Exception("Failed to get owner. {0}".format(stderr))
-
-  return stdout.split()[-2]
+  return file_owner_index.get_file_owner( filename )
 
 def installPackage(package_name):
 
@@ -67,36 +61,89 @@ def installPackage(package_name):
   if p.returncode != 0:
       raise Exception("Failed to install package. {0}".format(stderr))
 
-def dependsOn(library_filename, dependency_name, version=None):
+def loadPatternsFromFile( filename ):
+  """
+  Read dependency patterns from a file, one "<name> [<version>]" per line.
+  Empty lines and lines starting with '#' are ignored.
+  """
+  patterns = []
+  with open( filename ) as f:
+    for line in f:
+      words = line.split('#')[0].split()
+      if not words:
+        continue
+      if len(words) > 2:
+        raise Exception("Invalid dependency pattern: '{0}'".format( line.strip() ))
+      patterns.append( (words[0], words[1] if len(words) == 2 else None) )
+  return patterns
+
+def patternLabel(pattern):
+  name, version = pattern
+  return name if version is None else name + " " + version
+
+def compilePatterns(patterns):
+  """
+  Compile (name, version) patterns into a single regex. Each pattern is an
+  optional lookahead with its own group, so matching an object name once
+  tells which patterns it contains.
+  """
+  lookaheads = []
+  for i, (name, version) in enumerate(patterns):
+    lookahead = "(?P<p{0}>.*?{1})".format(i, re.escape(name))
+    if version is not None:
+      lookahead += "(?=.*?{0})".format(re.escape(version))
+    lookaheads.append( "(?:(?={0}))?".format(lookahead) )
+  return re.compile( "^" + "".join(lookaheads) )
+
+def matchedPatterns(library_filename, patterns, matcher):
+  """
+  Return the set of pattern indices matched by any object library_filename links to.
+  """
 
   p = subprocess.Popen(["ldd", library_filename], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
-  dependencies = []
+  matched = set()
 
   for line in p.stdout.readlines():
 
     aux = line.decode().split()
+    if not aux:
+      continue
+
+    groups = matcher.match( aux[0] ).groupdict()
+    hits = set( int(key[1:]) for key, value in groups.items() if value is not None )
 
-    if (dependency_name in aux[0]) and ((version is None) or (version in aux[0])):
+    if hits - matched:
       print(library_filename, aux)
-      return True
+      matched |= hits
+
+    if len(matched) == len(patterns):
+      break
+
+  p.communicate()
 
-  return False
+  return matched
 
 def loadPackagesFromFile( filename ):
   with open( filename ) as f:
     words = f.read().split()
     return set(words)
 
-def searchForPackages(root_dir, dependency_name, dependency_version, verbose=False):
-  ret = set()
+def searchForPackages(root_dir, patterns, verbose=False):
+  """
+  Scan every file under root_dir once, and return a dictionary mapping the
+  owning packages to the set of pattern indices they matched.
+  """
+  matcher = compilePatterns( patterns )
+  ret = {}
   for root, _, filenames in os.walk( root_dir ):
     for filename in filenames:
       filepath = os.path.join(root, filename)
-      if ( dependsOn(filepath, dependency_name, dependency_version) ):
+      matched = matchedPatterns(filepath, patterns, matcher)
+      if matched:
         if verbose:
           print( filepath )
-        ret.add( queryFileOwner(filepath) )
+        ret.setdefault( queryFileOwner(filepath), set() ).update( matched )
   return ret
 
 def getInverseBFS(graph):
@@ -121,19 +168,35 @@ def main(args):
   parser = argparse.ArgumentParser()
 
   parser.add_argument("root_dir", help="root dir to scan for outdated files")
-  parser.add_argument("dependency_name", help="dependency name to scan for. Example: boost")
-  parser.add_argument("--version", dest="dependency_version", help="dependency version to scan for. Example: 1.63")
+  parser.add_argument("dependency_names", nargs="*", help="dependency names to scan for, optionally as <name>:<version>. Example: boost:1.63 protobuf")
+  parser.add_argument("--version", dest="dependency_version", help="dependency version to scan for, for names given without one. Example: 1.63")
+  parser.add_argument("-f", "--patterns-file", help="file with one '<name> [<version>]' dependency pattern per line")
   parser.add_argument("-i", "--install", action="store_true", help="install outdated packages")
   parser.add_argument("-v", "--verbose", action="store_true", help="verbose output")
 
   args = parser.parse_args()
 
+  patterns = []
+  for dependency_name in args.dependency_names:
+    name, _, version = dependency_name.partition(":")
+    patterns.append( (name, version or args.dependency_version) )
+  if args.patterns_file:
+    patterns += loadPatternsFromFile( args.patterns_file )
+
+  if not patterns:
+    parser.error("at least one dependency name or a patterns file is required")
+
   #######################################################
   ## Query and load dependencies into dependency graph ##
   #######################################################
 
   print("searching for outdated files...")
-  packages = searchForPackages(args.root_dir, args.dependency_name, args.dependency_version, args.verbose)
+  package_matches = searchForPackages(args.root_dir, patterns, args.verbose)
+  packages = set( package_matches )
+
+  for package in sorted( package_matches ):
+    labels = [patternLabel( patterns[i] ) for i in sorted( package_matches[package] )]
+    print(package + ":", ", ".join( labels ))
 
   print("computing dependency graph...")
   pkg_graph = nx.DiGraph()
@@ -28,6 +28,7 @@ from builtins import input
 import object_deps
 import package_depsort
 import package_manager_api
+import package_mtree
 
 def query_yes_no(question, default=None):
     """Ask a yes/no question via raw_input() and return their answer.
@@ -70,11 +71,39 @@ def query_yes_no(question, default=None):
       else:
         sys.stdout.write("Please respond with 'yes' or 'no' (or 'y' or 'n').\n")
 
-def has_unresolved_dependencies(package, verbose=False):
+def get_mtree_object_files(package, check_modified=False, verbose=False):
+  """
+  Select the files worth checking from the package mtree metadata, without
+  touching the filesystem. If check_modified is set, files which differ from
+  the mtree are checked too, since their metadata can't be trusted.
+  """
+
+  object_files = []
+
+  for entry in package_mtree.get_package_mtree( package ):
+
+    if entry.type != "file":
+      continue
+
+    if check_modified and package_mtree.is_modified( entry ):
+      if verbose:
+        print("  file " + entry.path + " differs from the package mtree")
+      if os.path.isfile( entry.path ):
+        object_files.append( entry.path )
+
+    elif package_mtree.is_object_candidate( entry ):
+      object_files.append( entry.path )
+
+  return object_files
+
+def has_unresolved_dependencies(package, verbose=False, mtree=False, check_modified=False):
 
   is_outdated = False
 
-  installed_files = package_manager_api.get_installed_files( package )
+  if mtree:
+    installed_files = get_mtree_object_files(package, check_modified, verbose)
+  else:
+    installed_files = package_manager_api.get_installed_files( package )
   #print( installed_files )
 
   for filename in installed_files:
@@ -103,6 +132,8 @@ def main(args):
   parser.add_argument("-i", "--ignore", help="Ignore packages.", nargs='+')
   parser.add_argument("-v", "--verbose", action="store_true", help="Show verbose output.")
   parser.add_argument("-d", "--dryrun", action="store_true", help="Only list outdated packages without installing.")
+  parser.add_argument("-m", "--mtree", action="store_true", help="Select files to check from the package mtree metadata instead of the filesystem.")
+  parser.add_argument("--check-modified", action="store_true", help="With --mtree, also check files whose size or mtime differ from the package mtree.")
   args = parser.parse_args()
 
   ######
@@ -139,7 +170,7 @@ def main(args):
       print("WARNING, package " + package + " was not found.", file=sys.stderr)
       continue
 
-    if has_unresolved_dependencies(package, args.verbose):
+    if has_unresolved_dependencies(package, args.verbose, args.mtree, args.check_modified):
 
       print("package " + package + " needs to be reinstalled.")
 